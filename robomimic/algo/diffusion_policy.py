@@ -22,10 +22,56 @@ import robomimic.utils.obs_utils as ObsUtils
 
 from robomimic.algo import register_algo_factory_func, PolicyAlgo
 
-import random
-import robomimic.utils.torch_utils as TorchUtils
-import robomimic.utils.tensor_utils as TensorUtils
-import robomimic.utils.obs_utils as ObsUtils
+
+def _add_noise_fused(sqrt_ap, sqrt_omap, actions, noise, timesteps):
+    """
+    Fused forward-diffusion step, equivalent to noise_scheduler.add_noise but
+    indexing precomputed device tables: gathers the per-timestep alpha-schedule
+    coefficients and forms sqrt_ap * actions + sqrt_omap * noise in one expression.
+    """
+    sa = sqrt_ap[timesteps].view(-1, 1, 1)
+    so = sqrt_omap[timesteps].view(-1, 1, 1)
+    return torch.addcmul(sa * actions, so, noise)
+
+
+def _ddim_step_fast(naction, noise_pred, sqrt_alpha, sqrt_om_alpha, sqrt_alpha_prev, sqrt_om_alpha_prev, clip_sample):
+    """
+    Closed-form DDIM (eta=0, epsilon prediction) update, equivalent to
+    DDIMScheduler.step for that configuration. Takes the current step's 0-d
+    coefficient tensors as arguments so a single torch.compile graph serves
+    every timestep (indexing the tables inside the compiled function with a
+    Python step index would re-specialize per step).
+    """
+    pred_x0 = (naction - sqrt_om_alpha * noise_pred) / sqrt_alpha
+    if clip_sample:
+        pred_x0 = pred_x0.clamp(-1.0, 1.0)
+    return sqrt_alpha_prev * pred_x0 + sqrt_om_alpha_prev * noise_pred
+
+
+def _ddim_coefficient_tables(noise_scheduler, timesteps, device):
+    """
+    Build the per-step sqrt alpha-schedule tables (current and previous
+    timestep) used by @_ddim_step_fast, matching DDIMScheduler.step's
+    coefficient lookups for the given timestep schedule.
+
+    Returns:
+        4-tuple of 1D tensors on @device, indexed by schedule position:
+        sqrt(alpha_t), sqrt(1 - alpha_t), sqrt(alpha_prev), sqrt(1 - alpha_prev)
+    """
+    alphas_cumprod = noise_scheduler.alphas_cumprod
+    step_ratio = noise_scheduler.config.num_train_timesteps // len(timesteps)
+    alpha_t = torch.stack([alphas_cumprod[t] for t in timesteps])
+    alpha_prev = torch.stack([
+        alphas_cumprod[t - step_ratio] if t - step_ratio >= 0
+        else noise_scheduler.final_alpha_cumprod
+        for t in timesteps
+    ])
+    return (
+        torch.sqrt(alpha_t).to(device),
+        torch.sqrt(1.0 - alpha_t).to(device),
+        torch.sqrt(alpha_prev).to(device),
+        torch.sqrt(1.0 - alpha_prev).to(device),
+    )
 
 
 @register_algo_factory_func("diffusion_policy")
@@ -126,9 +172,125 @@ class DiffusionPolicyUNet(PolicyAlgo):
         self.noise_scheduler = noise_scheduler
         self.ema = ema
         self.action_check_done = False
+        self._obs_shape_check_done = False
         self.obs_queue = None
-        self.action_queue = None
-        
+
+        # pending actions from the last predicted trajectory, stored as a
+        # preallocated (Ta, action_dim) tensor with a read cursor (cursor == Ta
+        # means empty) instead of a deque of per-timestep tensors
+        self._action_buf = None
+        self._action_cursor = 0
+
+        # batched variant used by @get_action_batch for parallel envs
+        self._batched_action_buf = None
+        self._batched_action_cursor = 0
+
+        # cached inference timestep schedule (set once in @reset instead of
+        # calling set_timesteps on every inference), and a persistent 0-d buffer
+        # that carries the current timestep to the UNet without a per-step
+        # host-to-device scalar transfer
+        self._timesteps = None
+        self._timestep_buf = None
+
+        # per-step DDIM coefficient tables for the inlined scheduler step
+        # (built in @_init_inference_schedule once the schedule is known)
+        self._ddim_sqrt_alpha = None
+        self._ddim_sqrt_om_alpha = None
+        self._ddim_sqrt_alpha_prev = None
+        self._ddim_sqrt_om_alpha_prev = None
+
+        # precompute alpha-schedule lookup tables as device tensors so diffusion
+        # arithmetic can index GPU-resident constants instead of the scheduler's CPU tables
+        alphas_cumprod = self.noise_scheduler.alphas_cumprod.to(self.device)
+        self._sqrt_alphas_cumprod = torch.sqrt(alphas_cumprod)
+        self._sqrt_one_minus_alphas_cumprod = torch.sqrt(1.0 - alphas_cumprod)
+
+        # fused replacement for noise_scheduler.add_noise (gather + gather + fma
+        # collapse into one kernel under inductor when compilation is enabled),
+        # and the inlined DDIM update used by @_denoising_loop
+        self._add_noise = _add_noise_fused
+        self._ddim_step = _ddim_step_fast
+
+        # persistent training buffers, refilled in place each step instead of
+        # allocating fresh noise / timestep tensors (shapes are fixed per epoch)
+        self._noise_buf = None
+        self._ts_buf = None
+
+        # on-device loss ring buffer for amortized logging syncs
+        # (see @log_info and algo.loss_log_every)
+        self._loss_ring = None
+        self._loss_ring_idx = 0
+        self._last_logged_loss = None
+
+        # side stream for the EMA update so it can overlap the next batch's
+        # host-to-device copies instead of serializing on the default stream
+        self._ema_stream = None
+        if self.ema is not None and self.device.type == "cuda":
+            self._ema_stream = torch.cuda.Stream()
+
+        # optionally keep the obs encoder in bf16 - its conditioning output is
+        # re-read by the UNet's FiLM layers on every denoising step, so halving
+        # its width halves that bandwidth (the diffusion loss stays in fp32)
+        if self.algo_config.obs_encoder_bf16:
+            self.nets["policy"]["obs_encoder"] = self.nets["policy"]["obs_encoder"].to(dtype=torch.bfloat16)
+            if self.ema is not None:
+                self.ema.averaged_model["policy"]["obs_encoder"] = \
+                    self.ema.averaged_model["policy"]["obs_encoder"].to(dtype=torch.bfloat16)
+
+        # CUDA graph state for the inference denoising loop - static input buffers
+        # plus captured graphs keyed by (shapes, num_inference_timesteps, network)
+        self._cg_cache = dict()
+        self._cg_naction = None
+        self._cg_obs_cond = None
+
+        # persistent buffer for the initial action noise at inference (refilled
+        # in place each call; also a stable address for CUDA graph replays)
+        self._naction_buf = None
+
+        # cached obs encoding - obs_cond is invariant across the denoising loop, and
+        # consecutive inference calls fed the same observation tensors can reuse it.
+        # _obs_cond_src holds strong references to those tensors: keeping them alive
+        # is what makes the identity comparison in @_get_action_trajectory sound
+        # (a freed tensor's storage could otherwise be recycled for a new obs)
+        self._obs_cond_src = None
+        self._cached_obs_cond = None
+
+        # one-shot flag for the channels_last inference conversion (see @reset)
+        self._inference_nets_prepped = False
+
+        # optionally compile the noise prediction network with TorchInductor to fuse
+        # the pointwise ops (GroupNorm + Mish + Conv1d + FiLM) in the 1D UNet.
+        # the EMA copy is compiled as well since inference swaps to self.ema.averaged_model
+        if self.algo_config.compile.enabled:
+            if parse_version(torch.__version__) < parse_version("2.1.0"):
+                raise ImportError("algo.compile.enabled requires pytorch >= 2.1.0")
+            if self.algo_config.cuda_graph.enabled:
+                raise ValueError(
+                    "algo.compile.enabled and algo.cuda_graph.enabled are mutually exclusive - "
+                    "'reduce-overhead' compilation already applies CUDA graphs internally"
+                )
+            self.nets["policy"]["noise_pred_net"] = torch.compile(
+                self.nets["policy"]["noise_pred_net"],
+                mode=self.algo_config.compile.mode,
+                dynamic=False,
+            )
+            if self.ema is not None:
+                self.ema.averaged_model["policy"]["noise_pred_net"] = torch.compile(
+                    self.ema.averaged_model["policy"]["noise_pred_net"],
+                    mode=self.algo_config.compile.mode,
+                    dynamic=False,
+                )
+            self._add_noise = torch.compile(
+                _add_noise_fused,
+                mode=self.algo_config.compile.mode,
+                dynamic=False,
+            )
+            self._ddim_step = torch.compile(
+                _ddim_step_fast,
+                mode=self.algo_config.compile.mode,
+                dynamic=False,
+            )
+
     # 用于训练的输入预处理
     def process_batch_for_training(self, batch):
         """
@@ -147,28 +309,29 @@ class DiffusionPolicyUNet(PolicyAlgo):
         Ta = self.algo_config.horizon.action_horizon
         Tp = self.algo_config.horizon.prediction_horizon
         
-        input_batch = dict()
-        # 对batch["obs"]中的每个键值对(如图像/关节位置等),都取前To个时间步的观测数据
-        input_batch["obs"] = {k: batch["obs"][k][:, :To, :] for k in batch["obs"]}
-        # 使用get方法安全获取goal_obs,避免KeyError异常,当batch中不存在goal_obs键时返回默认值None
-        input_batch["goal_obs"] = batch.get("goal_obs", None) # goals may not be present
-        # 取前Tp个时间步的动作数据
-        input_batch["actions"] = batch["actions"][:, :Tp, :]
-        
         # check if actions are normalized to [-1,1],归一化数据有利于扩散模型的梯度计算和收敛
-        if not self.action_check_done:
-            actions = input_batch["actions"]
-            # 逐元素比较生成布尔张量
-            in_range = (-1 <= actions) & (actions <= 1)
-            # 检查布尔张量是否全部为True
-            all_in_range = torch.all(in_range).item()
-            if not all_in_range:
+        # single fused reduction on the pre-transfer (CPU) tensors so the implied host
+        # sync is cheap; runs once, and can be disabled entirely via algo.action_range_check
+        if not self.action_check_done and self.algo_config.action_range_check:
+            actions = batch["actions"][:, :Tp, :]
+            # the comparison is False for NaN entries, so .all() also flags them
+            if not bool((actions.abs() <= 1.0).all()):
                 raise ValueError("'actions' must be in range [-1,1] for Diffusion Policy! Check if hdf5_normalize_action is enabled.")
             # 避免重复检查
             self.action_check_done = True
-            
-        # 将input_batch转换为浮点类型,并将数据迁移到指定设备(CPU/GPU)
-        return TensorUtils.to_device(TensorUtils.to_float(input_batch), self.device)
+
+        # slice the time dimension, cast to float and move to the device in a single
+        # traversal with one fused (and non-blocking) .to call per tensor
+        input_batch = dict()
+        # 对batch["obs"]中的每个键值对(如图像/关节位置等),都取前To个时间步的观测数据
+        input_batch["obs"] = TensorUtils.slice_to_device_float(batch["obs"], slice(To), self.device)
+        # goals may not be present,当batch中不存在goal_obs键时返回默认值None
+        goal_obs = batch.get("goal_obs", None)
+        input_batch["goal_obs"] = TensorUtils.slice_to_device_float(goal_obs, slice(None), self.device) \
+            if goal_obs is not None else None
+        # 取前Tp个时间步的动作数据
+        input_batch["actions"] = TensorUtils.slice_to_device_float(batch["actions"], slice(Tp), self.device)
+        return input_batch
         
     def train_on_batch(self, batch, epoch, validate=False):
         """
@@ -201,30 +364,46 @@ class DiffusionPolicyUNet(PolicyAlgo):
             
             # encode obs
             inputs = {"obs": batch["obs"], "goal": batch["goal_obs"]}
-            for k in self.obs_shapes:
-                # first two dimensions should be [B, T] for inputs
-                assert inputs["obs"][k].ndim - 2 == len(self.obs_shapes[k])
+            if not self._obs_shape_check_done:
+                for k in self.obs_shapes:
+                    # first two dimensions should be [B, T] for inputs
+                    assert inputs["obs"][k].ndim - 2 == len(self.obs_shapes[k])
+                self._obs_shape_check_done = True
+            if self.algo_config.obs_encoder_bf16:
+                # the visual tower runs in bf16; loss computation below stays fp32
+                inputs["obs"] = {k: v.to(torch.bfloat16) for k, v in inputs["obs"].items()}
             # 时间分布式编码,将编码器obs_encoder应用于每个时间步的观测数据
-            obs_features = TensorUtils.time_distributed(inputs, self.nets["policy"]["obs_encoder"], inputs_as_kwargs=True)
-            assert obs_features.ndim == 3  # [B, T, D]
-            # 特征扁平化,将时间步与特征维度合并为2D张量,即将[B, T, D]转换为[B, T*D]
-            obs_cond = obs_features.flatten(start_dim=1)
+            # directly produces the flattened [B, T*D] conditioning, skipping the
+            # intermediate [B, T, D] reshape
+            obs_cond = TensorUtils.time_distributed_flat(inputs, self.nets["policy"]["obs_encoder"], inputs_as_kwargs=True)
+            assert obs_cond.ndim == 2  # [B, T*D]
+            if obs_cond.dtype != torch.float32:
+                # single cast to the fp32 dtype the UNet and MSE loss expect
+                obs_cond = obs_cond.float()
             
             # sample noise to add to actions
             # 生成与actions张量形状相同的‌高斯噪声‌(均值为0,方差为1)
-            noise = torch.randn(actions.shape, device=self.device)
-            
+            # the buffers are refilled in place - one allocator hit on the first
+            # step (or a shape change) instead of one per step
+            if self._noise_buf is None or self._noise_buf.shape != actions.shape:
+                self._noise_buf = torch.empty_like(actions)
+                self._ts_buf = torch.empty(B, dtype=torch.long, device=self.device)
+            noise = self._noise_buf.normal_()
+
             # sample a diffusion iteration for each data point
             # 为batch中的每个样本随机生成一个扩散时间步timesteps(范围从0到最大训练步数)
             # 输出为形状为(B,)的长整型张量,其中B为批次大小
             timesteps = torch.randint(
-                0, self.noise_scheduler.config.num_train_timesteps, 
-                (B,), device=self.device
-            ).long()
+                0, self.noise_scheduler.config.num_train_timesteps,
+                (B,), out=self._ts_buf
+            )
             
             # add noise to the clean actions according to the noise magnitude at each diffusion iteration
-            # 前向扩散过程
-            noisy_actions = self.noise_scheduler.add_noise(actions, noise, timesteps)
+            # 前向扩散过程 - fused path over the cached device alpha tables
+            noisy_actions = self._add_noise(
+                self._sqrt_alphas_cumprod, self._sqrt_one_minus_alphas_cumprod,
+                actions, noise, timesteps,
+            )
             
             # predict the noise residual,预测噪声残差
             noise_pred = self.nets["policy"]["noise_pred_net"](noisy_actions, timesteps, global_cond=obs_cond)
@@ -238,6 +417,12 @@ class DiffusionPolicyUNet(PolicyAlgo):
             info["losses"] = TensorUtils.detach(losses)
 
             if not validate:
+                # wait for the previous step's asynchronous EMA update before the
+                # optimizer writes the parameters it is still reading
+                # (write-after-read hazard across streams)
+                if self._ema_stream is not None:
+                    torch.cuda.current_stream().wait_stream(self._ema_stream)
+
                 # gradient step,梯度反向传播
                 policy_grad_norms = TorchUtils.backprop_for_loss(
                     net=self.nets,
@@ -249,7 +434,14 @@ class DiffusionPolicyUNet(PolicyAlgo):
                 # 对模型权重进行指数滑动平均,提升测试阶段的泛化性
                 # 原理:维护影子权重EMA_weights = decay * EMA_weights + (1 - decay) * Weights
                 if self.ema is not None:
-                    self.ema.step(self.nets)
+                    if self._ema_stream is not None:
+                        # run on the side stream, ordered after the optimizer step;
+                        # inference waits on this stream before reading the averaged weights
+                        self._ema_stream.wait_stream(torch.cuda.current_stream())
+                        with torch.cuda.stream(self._ema_stream):
+                            self.ema.step(self.nets)
+                    else:
+                        self.ema.step(self.nets)
                     
                 # 将梯度范数等指标存入日志字典info,便于可视化或早停判断
                 step_info = {"policy_grad_norms": policy_grad_norms}
@@ -269,7 +461,30 @@ class DiffusionPolicyUNet(PolicyAlgo):
             loss_log (dict): name -> summary statistic
         """
         log = super(DiffusionPolicyUNet, self).log_info(info)
-        log["Loss"] = info["losses"]["l2_loss"].item()
+        log_every = self.algo_config.loss_log_every
+        if log_every <= 1 or "policy_grad_norms" not in info:
+            # per-step sync. validation batches (no gradient step recorded in
+            # @info) always take this path so their losses never mix into the
+            # training window below
+            log["Loss"] = info["losses"]["l2_loss"].item()
+        else:
+            # accumulate training losses on-device and only pay the GPU->CPU sync
+            # for the window mean every @log_every calls; between flushes, report
+            # the last synced value
+            loss = info["losses"]["l2_loss"]
+            if self._loss_ring is None or self._loss_ring.numel() != log_every:
+                self._loss_ring = torch.zeros(log_every, device=loss.device)
+                self._loss_ring_idx = 0
+            self._loss_ring[self._loss_ring_idx] = loss
+            self._loss_ring_idx += 1
+            if self._loss_ring_idx == log_every:
+                self._last_logged_loss = self._loss_ring.mean().item()
+                self._loss_ring_idx = 0
+            elif self._last_logged_loss is None:
+                # seed from the first stored value rather than reporting 0.0
+                # until the first flush
+                self._last_logged_loss = loss.item()
+            log["Loss"] = self._last_logged_loss
         if "policy_grad_norms" in info:
             log["Policy_Grad_Norms"] = info["policy_grad_norms"]
         return log
@@ -282,9 +497,34 @@ class DiffusionPolicyUNet(PolicyAlgo):
         To = self.algo_config.horizon.observation_horizon
         Ta = self.algo_config.horizon.action_horizon
         obs_queue = deque(maxlen=To)
-        action_queue = deque(maxlen=Ta)
         self.obs_queue = obs_queue
-        self.action_queue = action_queue
+
+        # preallocate the pending-action buffer; cursor at Ta marks it empty
+        self._action_buf = torch.empty(Ta, self.ac_dim, device=self.device)
+        self._action_cursor = Ta
+        self._batched_action_buf = None
+        self._batched_action_cursor = 0
+
+        # configure the scheduler timestep schedule once per rollout
+        self._init_inference_schedule()
+
+        # drop the cached obs encoding from the previous rollout
+        self._obs_cond_src = None
+        self._cached_obs_cond = None
+
+        # one-time conversion of the visual tower to channels_last so its
+        # convolutions use the NHWC kernels. done here - outside any
+        # inference_mode scope - so the rebuilt parameters stay ordinary
+        # tensors that the EMA update can still write in place. note that
+        # GroupNorm cannot be folded back into BatchNorm or neighboring convs
+        # post-hoc (the normalization depends on input statistics), so the
+        # memory-format conversion is the safely fusable part
+        if self.algo_config.channels_last_inference and not self._inference_nets_prepped \
+                and self.device.type == "cuda":
+            self.nets["policy"]["obs_encoder"].to(memory_format=torch.channels_last)
+            if self.ema is not None:
+                self.ema.averaged_model["policy"]["obs_encoder"].to(memory_format=torch.channels_last)
+            self._inference_nets_prepped = True
     
     def get_action(self, obs_dict, goal_dict=None):
         """
@@ -308,94 +548,291 @@ class DiffusionPolicyUNet(PolicyAlgo):
         # n_repeats = max(To - len(self.obs_queue), 1)
         # self.obs_queue.extend([obs_dict] * n_repeats)
         
-        if len(self.action_queue) == 0:
+        if self._action_cursor == Ta:
             # no actions left, run inference
             # turn obs_queue into dict of tensors (concat at T dim)
             # import pdb; pdb.set_trace()
             # obs_dict_list = TensorUtils.list_of_flat_dict_to_dict_of_list(list(self.obs_queue))
             # obs_dict_tensor = dict((k, torch.cat(v, dim=0).unsqueeze(0)) for k,v in obs_dict_list.items())
-            
+
             # run inference
             # [1,T,Da]
             action_sequence = self._get_action_trajectory(obs_dict=obs_dict)
-            
-            # put actions into the queue
-            self.action_queue.extend(action_sequence[0])
-        
-        # has action, execute from left to right
-        # [Da]
-        action = self.action_queue.popleft()
-        
-        # [1,Da]
-        action = action.unsqueeze(0)
+
+            # refill the pending-action buffer in place
+            self._action_buf.copy_(action_sequence[0])
+            self._action_cursor = 0
+
+        # has action, execute from left to right. clone the [1,Da] slice so the
+        # caller never holds a live view into the reused buffer - to_numpy on
+        # CPU aliases tensor memory, and the next refill would silently rewrite
+        # every previously returned action (the clone is negligible next to the
+        # denoising pass)
+        action = self._action_buf[self._action_cursor:self._action_cursor + 1].clone()
+        self._action_cursor += 1
         return action
-        
-    def _get_action_trajectory(self, obs_dict, goal_dict=None):
-        assert not self.nets.training
-        To = self.algo_config.horizon.observation_horizon
+
+    def get_action_batch(self, obs_dict_list, goal_dict_list=None):
+        """
+        Get policy actions for several parallel environments with a single
+        denoising pass, instead of one _get_action_trajectory call per env.
+        When CUDA graphs are enabled, the stacked batch is padded up to the
+        next power-of-2 bucket so replays reuse a small set of captured graphs
+        across different env counts.
+
+        Args:
+            obs_dict_list (list): per-env observation dicts, each with [1, T, ...] tensors
+            goal_dict_list (list): (optional) per-env goal dicts
+
+        Returns:
+            action (torch.Tensor): action tensor [N, Da]
+        """
         Ta = self.algo_config.horizon.action_horizon
-        Tp = self.algo_config.horizon.prediction_horizon
-        action_dim = self.ac_dim
+        N = len(obs_dict_list)
+
+        if self._batched_action_buf is None or self._batched_action_buf.shape[0] != N:
+            self._batched_action_buf = torch.empty(N, Ta, self.ac_dim, device=self.device)
+            self._batched_action_cursor = Ta
+
+        if self._batched_action_cursor == Ta:
+            # no actions left, stack obs along the batch dim and run inference once
+            obs_dict = {k: torch.cat([od[k] for od in obs_dict_list], dim=0) for k in obs_dict_list[0]}
+            goal_dict = None
+            if goal_dict_list is not None:
+                goal_dict = {k: torch.cat([gd[k] for gd in goal_dict_list], dim=0) for k in goal_dict_list[0]}
+
+            if self.algo_config.cuda_graph.enabled and self.device.type == "cuda":
+                # pad up to the bucketed batch size (extra slots repeat the last
+                # env's obs and are discarded below)
+                B = 1 << (N - 1).bit_length()
+                if B != N:
+                    obs_dict = {
+                        k: torch.cat([v, v[-1:].expand(B - N, *v.shape[1:])], dim=0)
+                        for k, v in obs_dict.items()
+                    }
+                    if goal_dict is not None:
+                        goal_dict = {
+                            k: torch.cat([v, v[-1:].expand(B - N, *v.shape[1:])], dim=0)
+                            for k, v in goal_dict.items()
+                        }
+
+            # [B,Ta,Da]
+            action_sequence = self._get_action_trajectory(obs_dict=obs_dict, goal_dict=goal_dict)
+
+            # scatter trajectories back to the per-env buffers (drop padded slots)
+            self._batched_action_buf.copy_(action_sequence[:N])
+            self._batched_action_cursor = 0
+
+        # [N,Da] - cloned so callers never hold a live view into the persistent
+        # buffer that the next refill overwrites (same hazard as in @get_action)
+        action = self._batched_action_buf[:, self._batched_action_cursor].clone()
+        self._batched_action_cursor += 1
+        return action
+        
+    def _init_inference_schedule(self):
+        """
+        Configure the noise scheduler timestep schedule once and cache it,
+        instead of paying the set_timesteps call on every inference.
+        """
         if self.algo_config.ddpm.enabled is True:
             num_inference_timesteps = self.algo_config.ddpm.num_inference_timesteps
         elif self.algo_config.ddim.enabled is True:
             num_inference_timesteps = self.algo_config.ddim.num_inference_timesteps
         else:
             raise ValueError
-        
-        # select network
-        nets = self.nets
-        if self.ema is not None:
-            nets = self.ema.averaged_model
-        
-        # encode obs
-        inputs = {
-            "obs": obs_dict,
-            "goal": goal_dict
-        }
-        for k in self.obs_shapes:
-            # first two dimensions should be [B, T] for inputs
-            assert inputs["obs"][k].ndim - 2 == len(self.obs_shapes[k])
-        obs_features = TensorUtils.time_distributed(inputs, nets["policy"]["obs_encoder"], inputs_as_kwargs=True)
-        assert obs_features.ndim == 3  # [B, T, D]
-        B = obs_features.shape[0]
-
-        # reshape observation to (B,obs_horizon*obs_dim)
-        obs_cond = obs_features.flatten(start_dim=1)
-
-        # initialize action from Guassian noise
-        noisy_action = torch.randn(
-            (B, Tp, action_dim), device=self.device)
-        naction = noisy_action
-        
-        # init scheduler
         self.noise_scheduler.set_timesteps(num_inference_timesteps)
+        self._timesteps = self.noise_scheduler.timesteps
+        if self._timestep_buf is None:
+            self._timestep_buf = torch.zeros((), dtype=torch.long, device=self.device)
+
+        # precompute per-step DDIM (eta=0) coefficient tables so the inverse
+        # diffusion update is pure tensor arithmetic (see @_ddim_step_fast)
+        if self.algo_config.ddim.enabled and self.algo_config.ddim.prediction_type == "epsilon":
+            (
+                self._ddim_sqrt_alpha,
+                self._ddim_sqrt_om_alpha,
+                self._ddim_sqrt_alpha_prev,
+                self._ddim_sqrt_om_alpha_prev,
+            ) = _ddim_coefficient_tables(self.noise_scheduler, self._timesteps, self.device)
+
+    def _get_action_trajectory(self, obs_dict, goal_dict=None):
+        assert not self.nets.training
+        To = self.algo_config.horizon.observation_horizon
+        Ta = self.algo_config.horizon.action_horizon
+        Tp = self.algo_config.horizon.prediction_horizon
+        action_dim = self.ac_dim
+        if self._timesteps is None:
+            # in case @reset was not called before inference
+            self._init_inference_schedule()
+        num_inference_timesteps = len(self._timesteps)
+
+        # inference_mode is stricter than no_grad (no version counters / view metadata);
+        # autocast runs the networks in bf16 on GPU while scheduler arithmetic stays fp32
+        use_amp = self.algo_config.inference_bf16 and self.device.type == "cuda"
+        with torch.inference_mode(), torch.autocast(
+            device_type="cuda",
+            dtype=torch.bfloat16,
+            enabled=use_amp,
+        ):
+            # select network
+            nets = self.nets
+            if self.ema is not None:
+                if self._ema_stream is not None:
+                    # ensure the last EMA update has finished before reading the averaged weights
+                    torch.cuda.current_stream().wait_stream(self._ema_stream)
+                nets = self.ema.averaged_model
+
+            # encode obs - skipped only when this call passes the exact same live
+            # tensor objects as the previous one (identity against the strong
+            # references in _obs_cond_src, so a recycled allocation can never
+            # masquerade as the cached observation)
+            if (
+                self._cached_obs_cond is not None
+                and self._obs_cond_src is not None
+                and all(self._obs_cond_src[k] is obs_dict[k] for k in self.obs_shapes)
+            ):
+                obs_cond = self._cached_obs_cond
+            else:
+                inputs = {
+                    "obs": obs_dict,
+                    "goal": goal_dict
+                }
+                if not self._obs_shape_check_done:
+                    for k in self.obs_shapes:
+                        # first two dimensions should be [B, T] for inputs
+                        assert inputs["obs"][k].ndim - 2 == len(self.obs_shapes[k])
+                    self._obs_shape_check_done = True
+                if self.algo_config.obs_encoder_bf16:
+                    inputs["obs"] = {k: v.to(torch.bfloat16) for k, v in inputs["obs"].items()}
+                # encode directly to (B,obs_horizon*obs_dim) without the
+                # intermediate [B, T, D] reshape
+                obs_cond = TensorUtils.time_distributed_flat(inputs, nets["policy"]["obs_encoder"], inputs_as_kwargs=True)
+                assert obs_cond.ndim == 2  # [B, T*D]
+                if obs_cond.dtype == torch.bfloat16 and not use_amp:
+                    # without autocast the UNet runs fp32, so match its dtype
+                    obs_cond = obs_cond.float()
+                self._obs_cond_src = {k: obs_dict[k] for k in self.obs_shapes}
+                self._cached_obs_cond = obs_cond
+            B = obs_cond.shape[0]
+
+            # initialize action from Guassian noise - refill the persistent
+            # buffer in place instead of allocating a fresh tensor per call
+            if self._naction_buf is None or self._naction_buf.shape != (B, Tp, action_dim):
+                self._naction_buf = torch.empty((B, Tp, action_dim), device=self.device)
+            naction = self._naction_buf.normal_()
+
+            if self.algo_config.cuda_graph.enabled and self.device.type == "cuda":
+                naction = self._denoise_with_cuda_graph(nets, naction, obs_cond, num_inference_timesteps)
+            else:
+                naction = self._denoising_loop(nets, naction, obs_cond)
+
+        # process action using Ta (upcast in case the loop ran under autocast)
+        start = To - 1
+        end = start + Ta
+        action = naction[:,start:end].float()
+        return action
+
+    def _denoising_loop(self, nets, naction, obs_cond):
+        """
+        Run the reverse diffusion loop over the cached timestep schedule and
+        return the denoised action trajectory.
+        """
+        ddim_fast = self._ddim_sqrt_alpha is not None
+        for i, k in enumerate(self._timesteps):
+            # write the timestep into the persistent 0-d device buffer instead of
+            # shipping a fresh scalar tensor to the device each step (the per-step
+            # allocation would also block CUDA graph capture)
+            self._timestep_buf.fill_(int(k))
 
-        for k in self.noise_scheduler.timesteps:
             # predict noise
             noise_pred = nets["policy"]["noise_pred_net"](
-                sample=naction, 
-                timestep=k,
+                sample=naction,
+                timestep=self._timestep_buf,
                 global_cond=obs_cond
             )
 
-            # inverse diffusion step (remove noise)
-            naction = self.noise_scheduler.step(
-                model_output=noise_pred,
-                timestep=k,
-                sample=naction
-            ).prev_sample
-
-        # process action using Ta
-        start = To - 1
-        end = start + Ta
-        action = naction[:,start:end]
-        return action
+            if ddim_fast:
+                # inlined DDIM update over the precomputed coefficient tables
+                naction = self._ddim_step(
+                    naction, noise_pred.float(),
+                    self._ddim_sqrt_alpha[i], self._ddim_sqrt_om_alpha[i],
+                    self._ddim_sqrt_alpha_prev[i], self._ddim_sqrt_om_alpha_prev[i],
+                    self.algo_config.ddim.clip_sample,
+                )
+            else:
+                # inverse diffusion step (remove noise) - alpha-schedule math is
+                # precision sensitive, so keep it out of any enclosing autocast
+                with torch.autocast(device_type="cuda", enabled=False):
+                    naction = self.noise_scheduler.step(
+                        model_output=noise_pred.float(),
+                        timestep=k,
+                        sample=naction
+                    ).prev_sample
+        return naction
+
+    def _denoise_with_cuda_graph(self, nets, naction, obs_cond, num_inference_timesteps):
+        """
+        Replay the entire denoising loop as a single CUDA graph launch instead of
+        one kernel launch per op. The timestep schedule is fixed for a given
+        @num_inference_timesteps, so all Python-side scheduler overhead is paid once
+        at capture time; replays only require copying fresh inputs into the static
+        buffers. Graphs are cached per (shape, schedule, network) and re-captured
+        if any of these change.
+        """
+        key = (
+            tuple(naction.shape),
+            tuple(obs_cond.shape),
+            num_inference_timesteps,
+            id(nets["policy"]["noise_pred_net"]),
+        )
+        g = self._cg_cache.get(key)
+        if g is None:
+            # static input buffers - memory addresses must be stable across replays
+            self._cg_naction = naction.clone()
+            self._cg_obs_cond = obs_cond.clone()
+
+            # warmup and capture must run with the autocast weight-cast cache
+            # disabled: with caching on, the captured graph would reference casts
+            # cached outside capture, whose memory is recycled once the ambient
+            # autocast region exits (cf. torch.cuda.make_graphed_callables)
+            with torch.autocast(
+                device_type="cuda",
+                dtype=torch.bfloat16,
+                enabled=torch.is_autocast_enabled(),
+                cache_enabled=False,
+            ):
+                # warmup iterations on a side stream so one-time allocations
+                # (cuDNN workspaces, autotuning) happen outside capture
+                s = torch.cuda.Stream()
+                s.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(s):
+                    for _ in range(3):
+                        self._denoising_loop(nets, self._cg_naction, self._cg_obs_cond)
+                torch.cuda.current_stream().wait_stream(s)
+
+                g = torch.cuda.CUDAGraph()
+                with torch.cuda.graph(g):
+                    out = self._denoising_loop(nets, self._cg_naction, self._cg_obs_cond)
+                    self._cg_naction.copy_(out)
+
+            # drop graphs captured for stale shapes/schedules
+            self._cg_cache = {key: g}
+
+        self._cg_naction.copy_(naction)
+        self._cg_obs_cond.copy_(obs_cond)
+        g.replay()
+
+        # clone so the result survives the next replay overwriting the static buffer
+        return self._cg_naction.clone()
 
     def serialize(self):
         """
         Get dictionary of current model parameters.
         """
+        if self._ema_stream is not None:
+            # make sure the last asynchronous EMA update has landed before
+            # snapshotting the averaged weights
+            torch.cuda.current_stream().wait_stream(self._ema_stream)
         return {
             "nets": self.nets.state_dict(),
             "optimizers": { k : self.optimizers[k].state_dict() for k in self.optimizers },
@@ -449,27 +886,26 @@ def replace_submodules(
     if parse_version(torch.__version__) < parse_version("1.9.0"):
         raise ImportError("This function requires pytorch >= 1.9.0")
 
-    bn_list = [k.split(".") for k, m 
-        in root_module.named_modules(remove_duplicate=True) 
-        if predicate(m)]
-    for *parent, k in bn_list:
-        parent_module = root_module
-        if len(parent) > 0:
-            parent_module = root_module.get_submodule(".".join(parent))
-        if isinstance(parent_module, nn.Sequential):
-            src_module = parent_module[int(k)]
-        else:
-            src_module = getattr(parent_module, k)
+    # single traversal that carries the parent reference, so each replacement is a
+    # direct setattr/setitem instead of a string-joined get_submodule lookup per hit
+    targets = []
+    stack = [root_module]
+    while stack:
+        parent_module = stack.pop()
+        for k, child in parent_module.named_children():
+            if predicate(child):
+                targets.append((parent_module, k, child))
+            else:
+                stack.append(child)
+    for parent_module, k, src_module in targets:
         tgt_module = func(src_module)
         if isinstance(parent_module, nn.Sequential):
             parent_module[int(k)] = tgt_module
         else:
             setattr(parent_module, k, tgt_module)
-    # verify that all modules are replaced
-    bn_list = [k.split(".") for k, m 
-        in root_module.named_modules(remove_duplicate=True) 
-        if predicate(m)]
-    assert len(bn_list) == 0
+    if __debug__:
+        # verify that all modules are replaced
+        assert not any(predicate(m) for _, m in root_module.named_modules(remove_duplicate=True))
     return root_module
 
 
@@ -479,11 +915,18 @@ def replace_bn_with_gn(
     """
     Relace all BatchNorm layers with GroupNorm.
     """
+    def make_gn(x):
+        # guard against integer division silently producing the wrong grouping
+        assert x.num_features % features_per_group == 0, \
+            "num_features ({}) must be divisible by features_per_group ({})".format(
+                x.num_features, features_per_group)
+        return nn.GroupNorm(
+            num_groups=x.num_features//features_per_group,
+            num_channels=x.num_features)
+
     replace_submodules(
         root_module=root_module,
         predicate=lambda x: isinstance(x, nn.BatchNorm2d),
-        func=lambda x: nn.GroupNorm(
-            num_groups=x.num_features//features_per_group, 
-            num_channels=x.num_features)
+        func=make_gn,
     )
     return root_module
@@ -1,6 +1,6 @@
 """ This file contains nets used for Diffusion Policy. """
 import math
-from typing import Union
+from typing import Optional, Union
 
 import torch
 import torch.nn as nn
@@ -198,10 +198,10 @@ class ConditionalUnet1D(nn.Module):
             sum(p.numel() for p in self.parameters()))
         )
 
-    def forward(self, 
-            sample: torch.Tensor, 
-            timestep: Union[torch.Tensor, float, int], 
-            global_cond=None):
+    def forward(self,
+            sample: torch.Tensor,
+            timestep: Union[torch.Tensor, float, int],
+            global_cond: Optional[torch.Tensor] = None) -> torch.Tensor:
         """
         x: (B,T,input_dim)
         timestep: (B,) or int, diffusion step
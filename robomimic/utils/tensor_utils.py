@@ -276,6 +276,33 @@ def to_device(x, device):
     )
 
 
+def slice_to_device_float(x, time_slice, device, non_blocking=True):
+    """
+    Slices the time dimension (dimension 1) of all torch tensors in nested
+    dictionary or list or tuple @x with @time_slice, and casts + moves them to
+    @device, in a single traversal with one fused .to(device, dtype) call per
+    tensor (instead of separate to_float and to_device passes).
+
+    Args:
+        x (dict or list or tuple): a possibly nested dictionary or list or tuple
+        time_slice (slice): slice to apply to dimension 1 of each tensor
+        device (torch.Device): device to send tensors to
+        non_blocking (bool): if True, overlap host-to-device copies with compute
+            (effective when the dataloader uses pinned memory)
+
+    Returns:
+        y (dict or list or tuple): new nested dict-list-tuple of sliced float tensors on @device
+    """
+    return recursive_dict_list_tuple_apply(
+        x,
+        {
+            torch.Tensor: lambda x, s=time_slice, d=device: x[:, s].to(
+                device=d, dtype=torch.float32, non_blocking=non_blocking),
+            type(None): lambda x: x,
+        }
+    )
+
+
 def to_tensor(x):
     """
     Converts all numpy arrays in nested dictionary or list or tuple to
@@ -958,3 +985,37 @@ def time_distributed(inputs, op, activation=None, inputs_as_kwargs=False, inputs
         outputs = map_tensor(outputs, activation)
     outputs = reshape_dimensions(outputs, begin_axis=0, end_axis=0, target_dims=(batch_size, seq_len))
     return outputs
+
+
+def time_distributed_flat(inputs, op, activation=None, inputs_as_kwargs=False, inputs_as_args=False, **kwargs):
+    """
+    Like @time_distributed, but expects @op to return a single tensor of shape [B * T, D]
+    and directly emits outputs of shape [B, T * D]. This saves the intermediate reshape
+    back to [B, T, D] for callers that would immediately flatten the time and feature
+    dimensions together.
+
+    Args:
+        inputs (list or tuple or dict): a possibly nested dictionary or list or tuple with tensors
+            of leading dimensions [B, T, ...]
+        op: a layer op that accepts inputs and returns a single tensor of shape [B * T, D]
+        activation: activation to apply at the output
+        inputs_as_kwargs (bool): whether to feed input as a kwargs dict to the op
+        inputs_as_args (bool) whether to feed input as a args list to the op
+        kwargs (dict): other kwargs to supply to the op
+
+    Returns:
+        outputs (torch.Tensor): tensor of shape [B, T * D]
+    """
+    batch_size, seq_len = flatten_nested_dict_list(inputs)[0][1].shape[:2]
+    inputs = join_dimensions(inputs, 0, 1)
+    if inputs_as_kwargs:
+        outputs = op(**inputs, **kwargs)
+    elif inputs_as_args:
+        outputs = op(*inputs, **kwargs)
+    else:
+        outputs = op(inputs, **kwargs)
+
+    if activation is not None:
+        outputs = map_tensor(outputs, activation)
+    assert isinstance(outputs, torch.Tensor) and outputs.ndim == 2  # [B * T, D]
+    return outputs.reshape(batch_size, -1)
@@ -10,6 +10,8 @@ echo "running tests for bcq..."
 python test_bcq.py
 echo "running tests for cql..."
 python test_cql.py
+echo "running tests for diffusion policy..."
+python test_diffusion_policy.py
 echo "running tests for scripts..."
 python test_scripts.py
 echo "running tests for examples..."